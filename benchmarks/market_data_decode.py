@@ -0,0 +1,91 @@
+"""
+Стоимость обработки одного тика last_price на пути, которым идёт бот:
+StreamMarketData (tinkoff-датаклассы) против RawStreamMarketData (сырой protobuf).
+
+Оба варианта: разбор сообщения, получение объекта, который StreamManager
+передаёт стратегии, и READS_PER_TICK чтений цены через quotation_to_decimal
+(_check_breakout, _signal_strength, _check_replace_order). Память меряется
+как пик выделений внутри одного тика, включая временные объекты.
+
+Запуск: python -m benchmarks.market_data_decode
+"""
+import timeit
+import tracemalloc
+
+import tinkoff.invest as ti
+from tinkoff.invest._grpc_helpers import protobuf_to_dataclass
+from tinkoff.invest.grpc import marketdata_pb2
+from tinkoff.invest.utils import quotation_to_decimal
+
+from trading_bot.tinkoff_client.raw_market_data import LastPriceRecord
+
+N_TIMEIT = 100_000
+N_ALLOC = 10_000
+READS_PER_TICK = 3
+
+
+def make_payload() -> bytes:
+    response = marketdata_pb2.MarketDataResponse()
+    last_price = response.last_price
+    last_price.figi = "FUTNG0525000"
+    last_price.instrument_uid = "f1e9c6a4-4b6e-4b4a-9a3f-1d2c3b4a5f6e"
+    last_price.price.units = 3
+    last_price.price.nano = 512000000
+    last_price.time.seconds = 1_746_000_000
+    last_price.time.nanos = 123_456_000
+    return response.SerializeToString()
+
+
+def tick_dataclass(payload: bytes) -> ti.LastPrice:
+    msg = marketdata_pb2.MarketDataResponse.FromString(payload)
+    last_price = protobuf_to_dataclass(msg, ti.MarketDataResponse).last_price
+    for _ in range(READS_PER_TICK):
+        quotation_to_decimal(last_price.price)
+    return last_price
+
+
+def tick_raw(payload: bytes) -> LastPriceRecord:
+    msg = marketdata_pb2.MarketDataResponse.FromString(payload)
+    record = LastPriceRecord.from_message(msg.last_price)
+    for _ in range(READS_PER_TICK):
+        quotation_to_decimal(record.price)
+    return record
+
+
+def per_message_us(func, payload: bytes) -> float:
+    total = min(timeit.repeat(lambda: func(payload), number=N_TIMEIT, repeat=5))
+    return total / N_TIMEIT * 1e6
+
+
+def allocated_per_message(func, payload: bytes) -> float:
+    """
+    Пик памяти, выделенной за один тик, в байтах, в среднем по N_ALLOC тикам.
+
+    Временные объекты (дерево датаклассов MarketDataResponse) освобождаются
+    до конца тика, но попадают в пик.
+    """
+    func(payload)  # прогрев кешей tinkoff/protobuf вне замера
+    total = 0
+    tracemalloc.start()
+    for _ in range(N_ALLOC):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        func(payload)
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - current
+    tracemalloc.stop()
+    return total / N_ALLOC
+
+
+def main():
+    payload = make_payload()
+
+    print(f"{'режим':<12}{'мкс/тик':>10}{'пик байт/тик':>15}")
+    for name, func in (("dataclass", tick_dataclass), ("raw", tick_raw)):
+        us = per_message_us(func, payload)
+        size = allocated_per_message(func, payload)
+        print(f"{name:<12}{us:>10.2f}{size:>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
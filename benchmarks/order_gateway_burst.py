@@ -0,0 +1,64 @@
+"""
+Задержка входа при одновременном пробое по многим инструментам:
+OrderGateway против последовательных post_order, на фейковом клиенте
+с фиксированной задержкой RPC. Корректность гейтвея проверяется
+в tests/test_order_gateway.py, здесь только замеры.
+
+Запуск: python -m benchmarks.order_gateway_burst
+"""
+import asyncio
+import time
+
+import tinkoff.invest as ti
+
+from trading_bot.core.orders.order_gateway import OrderGateway
+from trading_bot.core.utils import create_order_id
+
+BURST = 50
+RPC_LATENCY = 0.05
+
+
+class FakeClient:
+    async def post_order(self, order_params: ti.PostOrderRequest) -> ti.PostOrderResponse:
+        await asyncio.sleep(RPC_LATENCY)
+        return ti.PostOrderResponse(order_id=f"exchange-{order_params.order_id}")
+
+
+def make_requests() -> list[ti.PostOrderRequest]:
+    return [ti.PostOrderRequest(order_id=create_order_id(), quantity=1) for _ in range(BURST)]
+
+
+async def sequential() -> list[float]:
+    client = FakeClient()
+    start = time.monotonic()
+    latencies = []
+    for req in make_requests():
+        await client.post_order(req)
+        latencies.append(time.monotonic() - start)
+    return latencies
+
+
+async def pipelined() -> list[float]:
+    gateway = OrderGateway(FakeClient())
+    start = time.monotonic()
+    latencies = []
+
+    async def enter(req: ti.PostOrderRequest, priority: float):
+        await gateway.post_order(req, priority=priority)
+        latencies.append(time.monotonic() - start)
+
+    await asyncio.gather(*(enter(req, priority=i) for i, req in enumerate(make_requests())))
+    await gateway.stop()
+    return sorted(latencies)
+
+
+async def main():
+    seq = await sequential()
+    pipe = await pipelined()
+    print(f"{BURST} заявок, RPC {RPC_LATENCY * 1000:.0f} мс")
+    print(f"sequential: первая {seq[0] * 1000:.0f} мс, последняя {seq[-1] * 1000:.0f} мс")
+    print(f"gateway:    первая {pipe[0] * 1000:.0f} мс, последняя {pipe[-1] * 1000:.0f} мс")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
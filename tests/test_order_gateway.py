@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import time
+import types
+
+import pytest
+
+ti = pytest.importorskip("tinkoff.invest")
+
+import grpc
+from tinkoff.invest.exceptions import AioRequestError
+from tinkoff.invest.schemas import OrderIdType
+
+from trading_bot.core.orders.order_gateway import OrderGateway
+from trading_bot.core.utils import create_order_id
+
+
+def rpc_error(code: grpc.StatusCode, ratelimit_reset: int = None) -> AioRequestError:
+    return AioRequestError(code, code.name, types.SimpleNamespace(ratelimit_reset=ratelimit_reset))
+
+
+class FakeClient:
+    """post_order с задержкой; errors[order_id] — ошибки на первые попытки по порядку."""
+
+    def __init__(self, latency: float = 0.0, errors: dict = None, states: dict = None):
+        self.latency = latency
+        self.errors = {k: list(v) for k, v in (errors or {}).items()}
+        self.states = states or {}
+        self.calls: list[tuple[str, float]] = []
+        self.lookups: list[tuple[str, OrderIdType]] = []
+
+    @property
+    def call_ids(self) -> list[str]:
+        return [order_id for order_id, _ in self.calls]
+
+    async def post_order(self, order_params: ti.PostOrderRequest) -> ti.PostOrderResponse:
+        self.calls.append((order_params.order_id, time.monotonic()))
+        await asyncio.sleep(self.latency)
+        errors = self.errors.get(order_params.order_id)
+        if errors:
+            raise errors.pop(0)
+        return ti.PostOrderResponse(order_id=f"exchange-{order_params.order_id}")
+
+    async def get_status_order(self, order_id: str, order_id_type: OrderIdType) -> ti.OrderState:
+        self.lookups.append((order_id, order_id_type))
+        if order_id not in self.states:
+            raise rpc_error(grpc.StatusCode.NOT_FOUND)
+        return self.states[order_id]
+
+
+class HangingClient(FakeClient):
+    async def post_order(self, order_params: ti.PostOrderRequest) -> ti.PostOrderResponse:
+        self.calls.append((order_params.order_id, time.monotonic()))
+        await asyncio.sleep(3600)
+
+
+def make_request() -> ti.PostOrderRequest:
+    return ti.PostOrderRequest(order_id=create_order_id(), quantity=1)
+
+
+def test_same_order_id_is_sent_once():
+    async def scenario():
+        client = FakeClient(latency=0.01)
+        gateway = OrderGateway(client)
+        req = make_request()
+        first, second = await asyncio.gather(gateway.post_order(req), gateway.post_order(req))
+        cached = await gateway.post_order(req)
+        await gateway.stop()
+        return client, req, first, second, cached
+
+    client, req, first, second, cached = asyncio.run(scenario())
+    assert client.call_ids == [req.order_id]
+    assert first.order_id == second.order_id == cached.order_id == f"exchange-{req.order_id}"
+
+
+def test_empty_order_id_is_rejected():
+    async def scenario():
+        gateway = OrderGateway(FakeClient())
+        with pytest.raises(ValueError):
+            await gateway.post_order(ti.PostOrderRequest(order_id="", quantity=1))
+
+    asyncio.run(scenario())
+
+
+def test_burst_last_entry_close_to_first():
+    async def scenario():
+        client = FakeClient(latency=0.05)
+        gateway = OrderGateway(client)
+        start = time.monotonic()
+        latencies = []
+
+        async def enter(req):
+            await gateway.post_order(req)
+            latencies.append(time.monotonic() - start)
+
+        await asyncio.gather(*(enter(make_request()) for _ in range(50)))
+        await gateway.stop()
+        return client, sorted(latencies)
+
+    client, latencies = asyncio.run(scenario())
+    assert len(client.calls) == 50
+    assert latencies[-1] < 2 * latencies[0]
+
+
+def test_higher_priority_sent_first_when_quota_is_tight():
+    async def scenario():
+        client = FakeClient()
+        gateway = OrderGateway(client, max_in_flight=1, rate=100.0, burst=1)
+        requests = [make_request() for _ in range(5)]
+        await asyncio.gather(*(
+            gateway.post_order(req, priority=i) for i, req in enumerate(requests)
+        ))
+        await gateway.stop()
+        return client, requests
+
+    client, requests = asyncio.run(scenario())
+    assert client.call_ids == [req.order_id for req in reversed(requests)]
+
+
+def test_unavailable_is_retried_with_same_order_id():
+    req = make_request()
+
+    async def scenario():
+        client = FakeClient(errors={req.order_id: [rpc_error(grpc.StatusCode.UNAVAILABLE)]})
+        gateway = OrderGateway(client, retry_delay=0.01)
+        resp = await gateway.post_order(req)
+        await gateway.stop()
+        return client, resp
+
+    client, resp = asyncio.run(scenario())
+    assert client.call_ids == [req.order_id, req.order_id]
+    assert resp.order_id == f"exchange-{req.order_id}"
+
+
+def test_non_retryable_error_is_raised_without_retry():
+    req = make_request()
+
+    async def scenario():
+        client = FakeClient(errors={req.order_id: [rpc_error(grpc.StatusCode.INVALID_ARGUMENT)]})
+        gateway = OrderGateway(client, retry_delay=0.01)
+        with pytest.raises(AioRequestError):
+            await gateway.post_order(req)
+        await gateway.stop()
+        return client
+
+    client = asyncio.run(scenario())
+    assert client.call_ids == [req.order_id]
+    assert client.lookups == []
+
+
+def test_resource_exhausted_pauses_whole_queue():
+    exhausted, other = make_request(), make_request()
+    reset = 0.2
+
+    async def scenario():
+        client = FakeClient(errors={
+            exhausted.order_id: [rpc_error(grpc.StatusCode.RESOURCE_EXHAUSTED, reset)]
+        })
+        gateway = OrderGateway(client, rate=1000.0, burst=1, retry_delay=0.01)
+        start = time.monotonic()
+        await asyncio.gather(
+            gateway.post_order(exhausted, priority=1),
+            gateway.post_order(other, priority=0)
+        )
+        await gateway.stop()
+        return client, start
+
+    client, start = asyncio.run(scenario())
+    sent = {}
+    for order_id, at in client.calls:
+        sent.setdefault(order_id, []).append(at - start)
+    assert len(sent[exhausted.order_id]) == 2
+    assert sent[exhausted.order_id][1] >= reset * 0.9
+    assert sent[other.order_id][0] >= reset * 0.9
+    assert client.lookups == []
+
+
+def test_timeout_returns_order_found_by_request_id():
+    req = make_request()
+    state = ti.OrderState(order_id=f"exchange-{req.order_id}", order_request_id=req.order_id)
+
+    async def scenario():
+        client = HangingClient(states={req.order_id: state})
+        gateway = OrderGateway(client, timeout=0.01, retry_delay=0.001, max_retries=2)
+        resp = await gateway.post_order(req)
+        await gateway.stop()
+        return client, resp
+
+    client, resp = asyncio.run(scenario())
+    assert client.call_ids == [req.order_id] * 3
+    assert client.lookups == [(req.order_id, OrderIdType.ORDER_ID_TYPE_REQUEST)]
+    assert resp.order_id == f"exchange-{req.order_id}"
+
+
+def test_timeout_with_order_not_found_raises_without_traceback(caplog):
+    req = make_request()
+
+    async def scenario():
+        client = HangingClient()
+        gateway = OrderGateway(client, timeout=0.01, retry_delay=0.001, max_retries=1)
+        with pytest.raises(asyncio.TimeoutError):
+            await gateway.post_order(req)
+        await gateway.stop()
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(scenario())
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+
+
+def test_stop_cancels_callers_and_drops_queue():
+    async def scenario():
+        client = HangingClient()
+        gateway = OrderGateway(client, max_in_flight=1, timeout=3600)
+        tasks = [asyncio.create_task(gateway.post_order(make_request())) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        await gateway.stop()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        gateway.start()
+        await asyncio.sleep(0.01)
+        await gateway.stop()
+        return client, results
+
+    client, results = asyncio.run(scenario())
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert len(client.calls) == 1
+
+
+def test_retry_scheduled_before_stop_is_not_sent():
+    req = make_request()
+
+    async def scenario():
+        client = FakeClient(errors={req.order_id: [rpc_error(grpc.StatusCode.UNAVAILABLE)]})
+        gateway = OrderGateway(client, retry_delay=0.05)
+        task = asyncio.create_task(gateway.post_order(req))
+        await asyncio.sleep(0.01)
+        await gateway.stop()
+        gateway.start()
+        await asyncio.sleep(0.1)
+        await gateway.stop()
+        return client, task
+
+    client, task = asyncio.run(scenario())
+    assert task.cancelled() or isinstance(task.exception(), asyncio.CancelledError)
+    assert client.call_ids == [req.order_id]
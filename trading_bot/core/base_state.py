@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from trading_bot.core.orders.order_manager import OrderManager
     from trading_bot.tinkoff_client.client import TinkoffClient
+    from trading_bot.tinkoff_client.raw_market_data import LastPriceRecord
 
 
 class BaseState(ABC):
@@ -15,5 +16,5 @@ class BaseState(ABC):
         self.order_manager: 'OrderManager' = None
 
     @abstractmethod
-    async def new_price(self, *, price: ti.LastPrice, context):
+    async def new_price(self, *, price: 'ti.LastPrice | LastPriceRecord', context):
         pass
@@ -2,9 +2,14 @@ from abc import ABC, abstractmethod
 
 import tinkoff.invest as ti
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from trading_bot.tinkoff_client.raw_market_data import LastPriceRecord
+
 
 class BaseStrategy(ABC):
 
     @abstractmethod
-    async def new_price(self, price: ti.LastPrice):
+    async def new_price(self, price: 'ti.LastPrice | LastPriceRecord'):
         pass
@@ -5,14 +5,17 @@ from decimal import Decimal
 from typing import Optional
 
 from tinkoff import invest as ti
+from tinkoff.invest.exceptions import AioRequestError
 from tinkoff.invest.utils import quotation_to_decimal, decimal_to_quotation
 
 from trading_bot.config.config import Config
 from trading_bot.core.base_state import BaseState
 from trading_bot.core.base_strategy import BaseStrategy
+from trading_bot.core.orders.order_gateway import OrderGateway
 from trading_bot.core.orders.order_listener import OrderListener
 from trading_bot.core.orders.order_manager import OrderEvent, OrderEventType
 from trading_bot.core.utils import calc_point_price, create_order_id
+from trading_bot.tinkoff_client.raw_market_data import LastPriceRecord
 
 
 @dataclass(repr=True)
@@ -31,14 +34,16 @@ class WaitingBreakoutState(BaseState, OrderListener):
         self.context: 'DonchianStrategy' = context
 
         self._params: Optional[ti.PostOrderRequest] = None
+        self._params_data: Optional[DonchianData] = None
         self._order_id: Optional[str] = None
+        self._entry_pending: bool = False
 
         self._fill_quantity: int = 0
         self._execute_lots: int = 0
 
     async def new_price(
             self, *,
-            price: ti.LastPrice,
+            price: ti.LastPrice | LastPriceRecord,
             context: 'DonchianStrategy'
     ):
         if self._order_id is not None:
@@ -57,12 +62,36 @@ class WaitingBreakoutState(BaseState, OrderListener):
                         quantity=new_quantity
                     )
 
+        if self._order_id is not None or self._entry_pending:
+            return
+
         if direction := self._check_breakout(price=price, data=context.data):
-            params_order = self._get_params_order(direction=direction, context=context)
-            order_id = await self.order_manager.place_order(req=params_order, listener=self)
+            # order_id создаётся один раз на пробой: повтор после таймаута уходит
+            # с тем же ключом, и OrderGateway не выставит вторую заявку
+            if (self._params is None
+                    or self._params.direction != direction
+                    or self._params_data != context.data):
+                self._params = self._get_params_order(direction=direction, context=context)
+                self._params_data = dataclasses.replace(context.data)
+            params_order = self._params
+            self._entry_pending = True
+            try:
+                order_id = await self.order_manager.place_order(
+                    req=params_order,
+                    listener=self,
+                    priority=self._signal_strength(
+                        price=price, data=context.data, direction=direction
+                    )
+                )
+            except AioRequestError as e:
+                # заявка точно отклонена: следующий пробой пойдёт с новым ключом
+                if e.code not in OrderGateway.RETRYABLE_CODES:
+                    self._params = None
+                raise
+            finally:
+                self._entry_pending = False
             if order_id:
                 self._order_id = order_id
-                self._params = params_order
                 self._execute_lots = params_order.quantity
 
     async def order_handler(self, *, order_event: OrderEvent):
@@ -72,6 +101,9 @@ class WaitingBreakoutState(BaseState, OrderListener):
                 self._to_position_state()
             elif ev_type == OrderEventType.PARTIAL:
                 self._fill_quantity = order_event.filled_qty
+            elif ev_type == OrderEventType.REJECTED:
+                self._order_id = None
+                self._params = None
 
     # Не публичные методы __________________________________________________________________
 
@@ -85,7 +117,7 @@ class WaitingBreakoutState(BaseState, OrderListener):
 
     @staticmethod
     def _check_breakout(
-            price: ti.LastPrice,
+            price: ti.LastPrice | LastPriceRecord,
             data: DonchianData
     ) -> Optional[ti.OrderDirection]:
         price = quotation_to_decimal(price.price)
@@ -94,6 +126,20 @@ class WaitingBreakoutState(BaseState, OrderListener):
         elif price < data.breakout_short_20 - data.average_true_range / Decimal(2):
             return ti.OrderDirection.ORDER_DIRECTION_SELL
 
+    @staticmethod
+    def _signal_strength(
+            price: ti.LastPrice | LastPriceRecord,
+            data: DonchianData,
+            direction: ti.OrderDirection
+    ) -> float:
+        price = quotation_to_decimal(price.price)
+        if direction == ti.OrderDirection.ORDER_DIRECTION_BUY:
+            distance = price - data.breakout_long_20
+        else:
+            distance = data.breakout_short_20 - price
+        # сила пробоя в ATR: по ней OrderGateway упорядочивает заявки при нехватке квоты
+        return float(distance / data.average_true_range)
+
     def _get_params_order(
             self,
             direction: ti.OrderDirection,
@@ -127,7 +173,7 @@ class WaitingBreakoutState(BaseState, OrderListener):
         elif direction == ti.OrderDirection.ORDER_DIRECTION_SELL:
             return context.data.breakout_short_20 - min_price_increment
 
-    def _check_replace_order(self, price: ti.LastPrice) -> Optional[Decimal]:
+    def _check_replace_order(self, price: ti.LastPrice | LastPriceRecord) -> Optional[Decimal]:
         pr = quotation_to_decimal(price.price)
         old_pr = quotation_to_decimal(self._params.price)
         direct = self._params.direction
@@ -154,5 +200,5 @@ class DonchianStrategy(BaseStrategy):
         self.next_entry_price: Optional[Decimal] = None
         self.next_stop_loss: Optional[Decimal] = None
 
-    async def new_price(self, price: ti.LastPrice):
+    async def new_price(self, price: ti.LastPrice | LastPriceRecord):
         await self.state.new_price(context=self, price=price)
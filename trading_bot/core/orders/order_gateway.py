@@ -0,0 +1,267 @@
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import grpc
+import tinkoff.invest as ti
+from tinkoff.invest.exceptions import AioRequestError
+from tinkoff.invest.schemas import OrderIdType
+
+from trading_bot.tinkoff_client.client import TinkoffClient
+from trading_bot.utils.logger import logger
+
+# Приоритет служебных заявок (перевыставление), идущих впереди любых входов
+URGENT_PRIORITY = float("inf")
+
+
+class RateLimiter:
+    """Token bucket: не больше `rate` запросов в секунду, всплеск до `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self._rate = rate
+        self._burst = burst
+        self._tokens: float = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._updated:
+                    # квота брокера исчерпана: ждём окончания паузы
+                    await asyncio.sleep(self._updated - now)
+                    continue
+                self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def pause(self, seconds: float):
+        """Сжечь токены и не выдавать новые ближайшие `seconds` секунд."""
+        self._tokens = 0
+        self._updated = max(self._updated, time.monotonic() + seconds)
+
+
+@dataclass(order=True)
+class _QueuedOrder:
+    sort_key: tuple[float, int]
+    req: ti.PostOrderRequest = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    attempt: int = field(default=0, compare=False)
+
+
+class OrderGateway:
+    """
+    Конвейер выставления заявок перед OrderManager.
+
+    Запросы post_order уходят параллельно (до `max_in_flight` одновременно)
+    в пределах лимита `rate`/`burst`. Пока квоты не хватает, очередь
+    разбирается по убыванию `priority` (силы сигнала). Клиентский order_id
+    служит ключом идемпотентности: повторный вызов с тем же order_id не
+    создаёт новый запрос, а заявки, упавшие по таймауту или временной
+    ошибке, переотправляются с тем же order_id (с паузой) без риска двойного
+    исполнения. Если попытки исчерпаны, заявка ищется на бирже по order_id:
+    принятая заявка возвращается как успешная, а не как ошибка.
+    При RESOURCE_EXHAUSTED вся очередь встаёт до сброса квоты брокера
+    (ratelimit_reset из метаданных ошибки).
+    """
+
+    RETRYABLE_CODES = {
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+    }
+
+    def __init__(
+            self,
+            client: TinkoffClient,
+            max_in_flight: int = 50,
+            rate: float = 10.0,
+            burst: int = 50,
+            timeout: float = 2.0,
+            max_retries: int = 3,
+            retry_delay: float = 0.1,
+            responses_cache_size: int = 1024
+    ):
+        self._client = client
+        self._timeout = timeout
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay
+        self._limiter = RateLimiter(rate=rate, burst=burst)
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+        self._queue: asyncio.PriorityQueue[_QueuedOrder] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._send_tasks: set[asyncio.Task] = set()
+
+        self._pending: dict[str, asyncio.Future] = {}
+        self._responses: OrderedDict[str, ti.PostOrderResponse] = OrderedDict()
+        self._responses_cache_size = responses_cache_size
+
+    def start(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for task in self._send_tasks:
+            task.cancel()
+        self._send_tasks.clear()
+        # заявки из очереди не должны уйти при следующем start()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.cancel()
+        self._pending.clear()
+
+    async def post_order(
+            self,
+            req: ti.PostOrderRequest,
+            priority: float = 0.0
+    ) -> ti.PostOrderResponse:
+        order_id = req.order_id
+        if not order_id:
+            raise ValueError("order_id is required: it is the idempotency key")
+        if order_id in self._responses:
+            return self._responses[order_id]
+
+        fut = self._pending.get(order_id)
+        if fut is None:
+            self.start()
+            fut = asyncio.get_running_loop().create_future()
+            self._pending[order_id] = fut
+            self._queue.put_nowait(
+                _QueuedOrder(sort_key=(-priority, next(self._seq)), req=req, future=fut)
+            )
+        # shield: отмена одного ожидающего не должна отменять саму заявку
+        return await asyncio.shield(fut)
+
+    # Не публичные методы _______________________________________________________________________
+    async def _dispatch(self):
+        while True:
+            # Сначала слот и квота, потом выбор заявки: так из очереди берётся
+            # самая сильная заявка на момент, когда её реально можно отправить.
+            await self._in_flight.acquire()
+            try:
+                await self._limiter.acquire()
+                item = await self._queue.get()
+            except BaseException:
+                self._in_flight.release()
+                raise
+            if item.future.done():
+                self._in_flight.release()
+                continue
+            task = asyncio.create_task(self._send(item))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    async def _send(self, item: _QueuedOrder):
+        order_id = item.req.order_id
+        try:
+            resp = await self._post(item)
+        except Exception as e:
+            self._resolve(order_id, exc=e)
+        else:
+            # None: заявка отложена на повтор, future остаётся ожидать
+            if resp is not None:
+                self._remember(order_id, resp)
+                self._resolve(order_id, resp=resp)
+        finally:
+            self._in_flight.release()
+
+    async def _post(self, item: _QueuedOrder) -> Optional[ti.PostOrderResponse]:
+        try:
+            return await asyncio.wait_for(
+                self._client.post_order(item.req), timeout=self._timeout
+            )
+        except (asyncio.TimeoutError, AioRequestError) as e:
+            code = getattr(e, "code", None)
+            if isinstance(e, AioRequestError) and code not in self.RETRYABLE_CODES:
+                raise
+            delay = self._retry_delay * 2 ** item.attempt
+            if code == grpc.StatusCode.RESOURCE_EXHAUSTED:
+                # квота брокера уже выбрана: останавливаем всю очередь, а не только эту заявку
+                delay = self._ratelimit_reset(e) or delay
+                self._limiter.pause(delay)
+            if item.attempt < self._max_retries:
+                item.attempt += 1
+                # тот же order_id и тот же приоритет: повтор идемпотентен
+                asyncio.get_running_loop().call_later(delay, self._requeue, item)
+                return None
+            # при RESOURCE_EXHAUSTED заявка точно не принята, искать её незачем
+            if code != grpc.StatusCode.RESOURCE_EXHAUSTED:
+                if resp := await self._find_accepted(item.req.order_id):
+                    return resp
+            raise
+
+    @staticmethod
+    def _ratelimit_reset(error: AioRequestError) -> Optional[float]:
+        reset = getattr(error.metadata, "ratelimit_reset", None)
+        return float(reset) if reset else None
+
+    def _requeue(self, item: _QueuedOrder):
+        if not item.future.done():
+            self._queue.put_nowait(item)
+
+    async def _find_accepted(self, order_id: str) -> Optional[ti.PostOrderResponse]:
+        # После таймаута биржа могла принять заявку: ищем её по клиентскому order_id
+        try:
+            state: ti.OrderState = await asyncio.wait_for(
+                self._client.get_status_order(
+                    order_id, order_id_type=OrderIdType.ORDER_ID_TYPE_REQUEST
+                ),
+                timeout=self._timeout
+            )
+        except AioRequestError as e:
+            if e.code != grpc.StatusCode.NOT_FOUND:
+                logger.exception(f"Не удалось проверить заявку {order_id} после таймаута")
+            return None
+        except asyncio.TimeoutError:
+            logger.exception(f"Не удалось проверить заявку {order_id} после таймаута")
+            return None
+        return ti.PostOrderResponse(
+            order_id=state.order_id,
+            execution_report_status=state.execution_report_status,
+            lots_requested=state.lots_requested,
+            lots_executed=state.lots_executed,
+            initial_order_price=state.initial_order_price,
+            executed_order_price=state.executed_order_price,
+            total_order_amount=state.total_order_amount,
+            initial_commission=state.initial_commission,
+            executed_commission=state.executed_commission,
+            figi=state.figi,
+            direction=state.direction,
+            initial_security_price=state.initial_security_price,
+            order_type=state.order_type,
+            instrument_uid=state.instrument_uid,
+            order_request_id=state.order_request_id
+        )
+
+    def _resolve(
+            self,
+            order_id: str,
+            resp: Optional[ti.PostOrderResponse] = None,
+            exc: Optional[BaseException] = None
+    ):
+        fut = self._pending.pop(order_id, None)
+        if fut is None or fut.done():
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(resp)
+
+    def _remember(self, order_id: str, resp: ti.PostOrderResponse):
+        self._responses[order_id] = resp
+        if len(self._responses) > self._responses_cache_size:
+            self._responses.popitem(last=False)
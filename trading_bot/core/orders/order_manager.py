@@ -4,11 +4,13 @@ import uuid
 from dataclasses import dataclass
 from decimal import Decimal
 from enum import Enum
+from typing import Optional
 
 import tinkoff.invest as ti
 from grpc.aio import AioRpcError
 from tinkoff.invest.utils import quotation_to_decimal, decimal_to_quotation
 
+from trading_bot.core.orders.order_gateway import OrderGateway, URGENT_PRIORITY
 from trading_bot.core.orders.order_listener import OrderListener
 from trading_bot.tinkoff_client.client import TinkoffClient
 
@@ -44,8 +46,9 @@ class ReplaceLock:
 
 class OrderManager:
 
-    def __init__(self, client: TinkoffClient):
+    def __init__(self, client: TinkoffClient, gateway: Optional[OrderGateway] = None):
         self._client = client
+        self._gateway = gateway
         self._replace_lock = ReplaceLock()
 
         self._listeners: dict[str, OrderListener] = {}
@@ -55,9 +58,13 @@ class OrderManager:
 
     async def place_order(
             self, req: ti.PostOrderRequest,
-            listener: OrderListener
+            listener: OrderListener,
+            priority: float = 0.0
     ) -> str:
-        resp: ti.PostOrderResponse = await self._client.post_order(req)
+        if self._gateway:
+            resp: ti.PostOrderResponse = await self._gateway.post_order(req, priority=priority)
+        else:
+            resp: ti.PostOrderResponse = await self._client.post_order(req)
         order_id = resp.order_id
 
         self._listeners[order_id] = listener
@@ -95,7 +102,7 @@ class OrderManager:
                         order_id=str(uuid.uuid4())
                     )
                     listener = self._listeners.get(old_id)
-                    new_id = await self.place_order(new_req, listener)
+                    new_id = await self.place_order(new_req, listener, priority=URGENT_PRIORITY)
                     self._listeners.pop(old_id, None)
                     self._meta_request.pop(old_id, None)
         except AioRpcError:
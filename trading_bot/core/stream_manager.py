@@ -5,19 +5,26 @@ import tinkoff.invest as ti
 
 import trading_bot.tinkoff_client.client as tc
 from trading_bot.tinkoff_client.client import StreamMarketData
+from trading_bot.tinkoff_client.raw_market_data import LastPriceRecord, RawStreamMarketData
 
 
 class StreamManager:
-    def __init__(self, client: tc.TinkoffClient):
-        self._stream_market_data: tc.StreamMarketData = StreamMarketData(client._api)
+    def __init__(self, client: tc.TinkoffClient, raw: bool = False):
+        self._raw = raw
+        self._stream_market_data: tc.StreamMarketData | RawStreamMarketData
+        if raw:
+            self._stream_market_data = RawStreamMarketData(client._api)
+        else:
+            self._stream_market_data = StreamMarketData(client._api)
 
         self.map_context: dict[str, Any] = {}  # TODO: вместо Any добавить context
         self.map_task: dict[str, asyncio.Task] = {}
 
     async def _listen_market_data(self):
+        handler = self.raw_handler if self._raw else self.handler
         while True:
             response = await self._stream_market_data.request_queue.get()
-            self.handler(response)
+            handler(response)
 
     def handler(self, response: ti.MarketDataResponse):
         if response.last_price:
@@ -25,6 +32,11 @@ class StreamManager:
             if context:
                 task = asyncio.create_task(context.new_price(response.last_price))
 
+    def raw_handler(self, record: LastPriceRecord):
+        context = self.map_context.get(record.instrument_uid)
+        if context:
+            task = asyncio.create_task(context.new_price(record))
+
     async def get_last_price(self, instrument_uid: str):
         if self.map_context.get(instrument_uid):
             return await self.map_context[instrument_uid].get()
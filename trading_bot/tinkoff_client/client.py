@@ -78,12 +78,15 @@ class TinkoffClient:
         )
         return order_response
 
-    async def get_status_order(self, order_id: str) -> ti.OrderState:
+    async def get_status_order(
+            self, order_id: str,
+            order_id_type: OrderIdType = OrderIdType.ORDER_ID_TYPE_EXCHANGE
+    ) -> ti.OrderState:
         status_order: ti.OrderState = await self._api.orders.get_order_state(
             order_id=order_id,
             account_id=self.account_id,
             price_type=ti.PriceType.PRICE_TYPE_POINT,
-            order_id_type=OrderIdType.ORDER_ID_TYPE_EXCHANGE
+            order_id_type=order_id_type
         )
         return status_order
 
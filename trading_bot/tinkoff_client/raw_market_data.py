@@ -0,0 +1,134 @@
+import asyncio
+import datetime
+from typing import Optional
+
+import tinkoff.invest as ti
+from tinkoff.invest.async_services import AsyncServices
+from tinkoff.invest.grpc import marketdata_pb2
+
+from trading_bot.utils.logger import log
+
+
+class LastPriceRecord:
+    """
+    Компактная запись последней цены, заполняемая прямо из protobuf.
+
+    Повторяет нужную стратегиям часть ti.LastPrice (figi, instrument_uid,
+    price, time). Quotation для price собирается при первом обращении и
+    кешируется, полный ti.LastPrice строится по запросу через to_last_price().
+    """
+
+    __slots__ = ("figi", "instrument_uid", "units", "nano", "ts_seconds", "ts_nanos", "_price")
+
+    def __init__(
+            self,
+            figi: str,
+            instrument_uid: str,
+            units: int,
+            nano: int,
+            ts_seconds: int,
+            ts_nanos: int
+    ):
+        self.figi = figi
+        self.instrument_uid = instrument_uid
+        self.units = units
+        self.nano = nano
+        self.ts_seconds = ts_seconds
+        self.ts_nanos = ts_nanos
+        self._price: Optional[ti.Quotation] = None
+
+    @classmethod
+    def from_message(cls, msg: marketdata_pb2.LastPrice) -> 'LastPriceRecord':
+        price = msg.price
+        ts = msg.time
+        return cls(msg.figi, msg.instrument_uid, price.units, price.nano, ts.seconds, ts.nanos)
+
+    @property
+    def price(self) -> ti.Quotation:
+        if self._price is None:
+            self._price = ti.Quotation(units=self.units, nano=self.nano)
+        return self._price
+
+    @property
+    def time(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(
+            self.ts_seconds, tz=datetime.timezone.utc
+        ) + datetime.timedelta(microseconds=self.ts_nanos // 1000)
+
+    def to_last_price(self) -> ti.LastPrice:
+        return ti.LastPrice(
+            figi=self.figi,
+            price=self.price,
+            time=self.time,
+            instrument_uid=self.instrument_uid
+        )
+
+    def __repr__(self):
+        return (f"LastPriceRecord(figi={self.figi!r}, instrument_uid={self.instrument_uid!r}, "
+                f"units={self.units}, nano={self.nano}, "
+                f"ts_seconds={self.ts_seconds}, ts_nanos={self.ts_nanos})")
+
+
+class RawStreamMarketData:
+    """
+    Быстрый режим стрима рыночных данных: читает сырые protobuf-сообщения
+    в обход конвертации tinkoff в датаклассы.
+
+    Поддерживается только last_price: каждое сообщение превращается в
+    LastPriceRecord, остальные (ping, ответы на подписку) пропускаются.
+    Для свечей используйте StreamMarketData.
+    """
+
+    def __init__(self, api: AsyncServices):
+        self._service = api.market_data_stream
+        self._call = None
+        self._stream_task: Optional[asyncio.Task] = None
+        self._outgoing: asyncio.Queue = asyncio.Queue()
+        self._subscriptions: dict[str, marketdata_pb2.LastPriceInstrument] = {}
+
+        self.request_queue: asyncio.Queue = asyncio.Queue()
+
+    @log
+    async def _start_stream(self):
+        if not self._stream_task:
+            self._call = self._service.stub.MarketDataStream(
+                self._request_iterator(), metadata=self._service.metadata
+            )
+            self._stream_task = asyncio.create_task(self._listen_stream(self._call))
+
+    @log
+    def stop_stream(self):
+        if self._call:
+            self._call.cancel()
+            self._call = None
+        if self._stream_task:
+            self._stream_task.cancel()
+            self._stream_task = None
+
+    async def _request_iterator(self):
+        while True:
+            yield await self._outgoing.get()
+
+    async def _listen_stream(self, call):
+        from_message = LastPriceRecord.from_message
+        async for response in call:
+            if response.HasField("last_price"):
+                await self.request_queue.put(from_message(response.last_price))
+
+    async def subscribe_last_price(self, id_list: list[str]):
+        await self._start_stream()
+        list_last_price = [
+            marketdata_pb2.LastPriceInstrument(instrument_id=instr_id) for instr_id in id_list
+        ]
+
+        for instr in list_last_price:
+            self._subscriptions[instr.instrument_id] = instr
+
+        await self._outgoing.put(
+            marketdata_pb2.MarketDataRequest(
+                subscribe_last_price_request=marketdata_pb2.SubscribeLastPriceRequest(
+                    subscription_action=marketdata_pb2.SUBSCRIPTION_ACTION_SUBSCRIBE,
+                    instruments=list_last_price
+                )
+            )
+        )